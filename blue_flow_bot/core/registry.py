@@ -1,6 +1,6 @@
 # blue_flow_bot/core/registry.py
 
-from typing import Dict, Type
+from typing import Any, Callable, Container, Dict, List, NoReturn, Optional, Tuple, Type
 from blue_flow_bot.core.base_state import BaseState
 
 
@@ -28,6 +28,20 @@ class NodeSchemaError(Exception):
     pass
 
 
+# Marks a key absent from a node, so an explicit None is still checked
+_MISSING = object()
+
+
+def _check_choice(node_id: int, node: dict) -> None:
+    if "choices" not in node or "next_for_choice" not in node:
+        raise NodeSchemaError(
+            f"Choice node {node_id!r} missing 'choices' or 'next_for_choice'"
+        )
+
+
+SchemaCheck = Callable[[int, dict], None]
+
+
 class StateRegistry:
     """
     Maps state type names to BaseState subclasses, and validates flow definitions.
@@ -35,28 +49,58 @@ class StateRegistry:
 
     enable_context: bool = False
 
+    # Built-in state types, copied into every registry
+    _BUILTIN_TYPES: Dict[str, Type[BaseState]] = dict.fromkeys(
+        (
+            "choice",
+            "text",
+            "rich_text",
+            "tg_username",
+            "voice_upload",
+            "file_upload",
+            "cutscene",
+        ),
+        BaseState,
+    )
+
+    # Type-specific node schema checks; types without an entry need none
+    _SCHEMA_CHECKS: Dict[str, SchemaCheck] = {"choice": _check_choice}
+
     def __init__(self):
         # Pre-register built-in state types
-        self._registry: Dict[str, Type[BaseState]] = {
-            "choice": BaseState,
-            "text": BaseState,
-            "rich_text": BaseState,
-            "tg_username": BaseState,
-            "voice_upload": BaseState,
-            "file_upload": BaseState,
-            "cutscene": BaseState,
-        }
-
-    async def register_alias(self, type_name: str, cls: Type[BaseState]) -> None:
+        self._registry: Dict[str, Type[BaseState]] = self._BUILTIN_TYPES.copy()
+        self._schema_checks: Dict[str, SchemaCheck] = dict(self._SCHEMA_CHECKS)
+
+    def register_alias(
+        self,
+        type_name: str,
+        cls: Type[BaseState],
+        schema_check: Optional[SchemaCheck] = None,
+    ) -> None:
         """
         Register a new alias mapping a type_name to a BaseState subclass.
+        schema_check(node_id, node), if given, is run by validate_flow on
+        every node of this type and should raise NodeSchemaError.
         Raises ValueError if the alias already exists.
         """
-        if type_name in self._registry:
-            raise ValueError(f"Type alias '{type_name}' already registered")
-        self._registry[type_name] = cls
+        self.register_aliases({type_name: cls})
+        if schema_check is not None:
+            self._schema_checks[type_name] = schema_check
 
-    async def get(self, type_name: str) -> Type[BaseState]:
+    def register_aliases(self, mapping: Dict[str, Type[BaseState]]) -> None:
+        """
+        Register several aliases at once from a type_name -> class mapping.
+        Raises ValueError, registering nothing, if any alias already exists.
+        """
+        existing = self._registry.keys() & mapping.keys()
+        if existing:
+            if len(existing) == 1:
+                raise ValueError(f"Type alias '{existing.pop()}' already registered")
+            names = ", ".join(f"'{name}'" for name in sorted(existing))
+            raise ValueError(f"Type aliases {names} already registered")
+        self._registry.update(mapping)
+
+    def get(self, type_name: str) -> Type[BaseState]:
         """
         Look up a registered BaseState subclass by its type name.
         Raises UnknownStateTypeError if not found.
@@ -66,48 +110,78 @@ class StateRegistry:
         except KeyError:
             raise UnknownStateTypeError(f"Unknown state type '{type_name}'")
 
-    async def validate_flow(self, flow_json: dict[int, dict]) -> None:
+    def validate_flow(self, flow_json: dict[int, dict]) -> None:
         """
         Perform consistency checks on a flow definition:
           1) Every node has a 'type' key → FlowValidationError
           2) Every 'type' is registered → UnknownStateTypeError
           3) Type-specific node schema → NodeSchemaError
           4) All 'next' & 'next_for_choice' IDs exist → DanglingReferenceError
+        Node IDs may be ints or, for flows loaded straight from JSON, digit
+        strings; 'next' targets are compared as ints either way.
         """
-        # 1) Basic schema: 'type' present
+        if not flow_json:
+            return
+
+        # Single pass: schema, type and per-type checks; collect every edge
+        # destination, plus one (start index, node_id, next present, choice map)
+        # span per node so a failed sweep can name the edge's owner
+        registry = self._registry
+        schema_checks = self._schema_checks
+        dests: List[int] = []
+        spans: List[Tuple[int, int, bool, Any]] = []
         for node_id, node in flow_json.items():
-            if "type" not in node:
+            # 1) Basic schema: 'type' present
+            t = node.get("type", _MISSING)
+            if t is _MISSING:
                 raise FlowValidationError(f"Node {node_id!r} missing 'type'")
 
-        # 2) Known types
-        for node_id, node in flow_json.items():
-            t = node["type"]
-            if t not in self._registry:
+            # 2) Known types
+            if registry.get(t) is None:
                 raise UnknownStateTypeError(f"Unknown state type '{t}'")
 
-        # 3) Node-specific schema checks
-        for node_id, node in flow_json.items():
-            t = node["type"]
-            if t == "choice":
-                if "choices" not in node or "next_for_choice" not in node:
-                    raise NodeSchemaError(
-                        f"Choice node {node_id!r} missing 'choices' or 'next_for_choice'"
-                    )
+            # 3) Node-specific schema checks
+            checker = schema_checks.get(t)
+            if checker is not None:
+                checker(node_id, node)
+
+            nxt = node.get("next", _MISSING)
+            nfc = node.get("next_for_choice", _MISSING)
+            if nxt is not _MISSING or nfc is not _MISSING:
+                spans.append((len(dests), node_id, nxt is not _MISSING, nfc))
+                if nxt is not _MISSING:
+                    dests.append(nxt)
+                if nfc is not _MISSING:
+                    dests.extend(nfc.values())
 
         # 4) Reference integrity
-        valid_ids = {int(i) for i in flow_json.keys()}
-        for node_id, node in flow_json.items():
-            # single next
-            if "next" in node:
-                dest = node["next"]
-                if dest not in valid_ids:
-                    raise DanglingReferenceError(
-                        f"Node {node_id!r} references unknown next {dest}"
-                    )
-            # choice nexes
-            if "next_for_choice" in node:
-                for choice, dest in node["next_for_choice"].items():
-                    if dest not in valid_ids:
-                        raise DanglingReferenceError(
-                            f"Node {node_id!r} choice {choice!r} references unknown next {dest}"
-                        )
+        valid_ids: Container[int] = flow_json.keys()
+        # JSON object keys arrive as strings; compare them as ints
+        if isinstance(next(iter(flow_json)), str):
+            valid_ids = {int(i) for i in flow_json}
+        # Check all destinations in one C-level sweep; locate the offender only on failure
+        if not all(map(valid_ids.__contains__, dests)):
+            self._raise_dangling(dests, spans, valid_ids)
+
+    @staticmethod
+    def _raise_dangling(
+        dests: List[int],
+        spans: List[Tuple[int, int, bool, Any]],
+        valid_ids: Container[int],
+    ) -> NoReturn:
+        """
+        Raise DanglingReferenceError for the first entry of dests not in
+        valid_ids, naming its owner from the span validate_flow recorded.
+        """
+        i = next(i for i, dest in enumerate(dests) if dest not in valid_ids)
+        start, node_id, has_next, nfc = max(span for span in spans if span[0] <= i)
+        # single next
+        if has_next and i == start:
+            raise DanglingReferenceError(
+                f"Node {node_id!r} references unknown next {dests[i]}"
+            )
+        # choice nexes
+        choice = list(nfc)[i - start - has_next]
+        raise DanglingReferenceError(
+            f"Node {node_id!r} choice {choice!r} references unknown next {dests[i]}"
+        )
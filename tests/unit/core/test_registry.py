@@ -1,5 +1,7 @@
 # tests/unit/core/test_registry.py
 
+import json
+
 import pytest
 
 from blue_flow_bot.core.registry import (
@@ -28,8 +30,7 @@ class DummyState(BaseState):
         return None
 
 
-@pytest.mark.asyncio
-async def test_register_alias_idempotency():
+def test_register_alias_idempotency():
     """
     Registering the same alias twice should raise ValueError
     (duplicate alias not permitted).
@@ -37,25 +38,41 @@ async def test_register_alias_idempotency():
     registry = StateRegistry()
 
     # First registration succeeds
-    await registry.register_alias("foo", DummyState)
+    registry.register_alias("foo", DummyState)
 
     # Second registration must fail
     with pytest.raises(ValueError):
-        await registry.register_alias("foo", DummyState)
+        registry.register_alias("foo", DummyState)
+
+
+def test_register_aliases_is_all_or_nothing():
+    """
+    register_aliases() registers every alias, or none of them if any
+    name is already taken.
+    """
+    registry = StateRegistry()
+    registry.register_aliases({"foo": DummyState, "bar": DummyState})
+    assert registry.get("foo") is DummyState
+    assert registry.get("bar") is DummyState
+
+    with pytest.raises(ValueError, match="Type alias 'foo' already"):
+        registry.register_aliases({"baz": DummyState, "foo": DummyState})
+    with pytest.raises(ValueError, match="Type aliases 'bar', 'foo' already"):
+        registry.register_aliases({"bar": DummyState, "foo": DummyState})
+    with pytest.raises(UnknownStateTypeError):
+        registry.get("baz")
 
 
-@pytest.mark.asyncio
-async def test_get_unknown_raises_unknownstate():
+def test_get_unknown_raises_unknownstate():
     """
     Calling get() with an unregistered type name should
     raise UnknownStateTypeError.
     """
     registry = StateRegistry()
     with pytest.raises(UnknownStateTypeError):
-        await registry.get("nonexistent_type")
+        registry.get("nonexistent_type")
 
 
-@pytest.mark.asyncio
 @pytest.mark.parametrize(
     "bad_flow, expected_exc",
     [
@@ -69,7 +86,12 @@ async def test_get_unknown_raises_unknownstate():
             {0: {"type": "nope", "node_text": "Oops"}},
             UnknownStateTypeError,
         ),
-        # 3) Dangling reference in 'next' → DanglingReferenceError
+        # 3) Explicit None 'type' is present but unknown → UnknownStateTypeError
+        (
+            {0: {"type": None, "node_text": "Oops"}},
+            UnknownStateTypeError,
+        ),
+        # 4) Dangling reference in 'next' → DanglingReferenceError
         (
             {
                 0: {
@@ -82,7 +104,12 @@ async def test_get_unknown_raises_unknownstate():
             },
             DanglingReferenceError,
         ),
-        # 4) Choice node missing 'choices' key → NodeSchemaError
+        # 5) Explicit None 'next' is a dangling reference → DanglingReferenceError
+        (
+            {0: {"type": "cutscene", "node_text": "Bye", "next": None}},
+            DanglingReferenceError,
+        ),
+        # 6) Choice node missing 'choices' key → NodeSchemaError
         (
             {
                 0: {
@@ -94,28 +121,36 @@ async def test_get_unknown_raises_unknownstate():
             },
             NodeSchemaError,
         ),
+        # 7) Dangling reference in 'next_for_choice' → DanglingReferenceError
+        (
+            {
+                0: {
+                    "type": "choice",
+                    "node_text": "Pick one",
+                    "choices": ["a"],
+                    "next_for_choice": {"a": 7},
+                }
+            },
+            DanglingReferenceError,
+        ),
     ],
 )
-async def test_validate_flow_error_paths(bad_flow, expected_exc):
+def test_validate_flow_error_paths(bad_flow, expected_exc):
     """
     Each malformed flow should trigger exactly the right exception.
     """
     registry = StateRegistry()
     with pytest.raises(expected_exc):
-        await registry.validate_flow(bad_flow)
+        registry.validate_flow(bad_flow)
 
 
-@pytest.mark.asyncio
-async def test_validate_flow_valid_three_nodes():
+def test_validate_flow_valid_three_nodes():
     """
     A flow with 3 valid nodes should pass validation.
     """
+    # 'text' and 'choice' are built-in state types
     registry = StateRegistry()
 
-    # Register required state types
-    await registry.register_alias("text", DummyState)
-    await registry.register_alias("choice", DummyState)
-
     valid_flow = {
         0: {
             "type": "text",
@@ -139,4 +174,48 @@ async def test_validate_flow_valid_three_nodes():
     }
 
     # This should not raise any exceptions
-    await registry.validate_flow(valid_flow)
+    registry.validate_flow(valid_flow)
+
+
+def test_register_alias_schema_check_runs_on_nodes():
+    """
+    A schema_check passed to register_alias is applied to nodes of that type.
+    """
+    registry = StateRegistry()
+
+    def require_limit(node_id, node):
+        if "limit" not in node:
+            raise NodeSchemaError(f"Node {node_id!r} missing 'limit'")
+
+    registry.register_alias("limited", DummyState, schema_check=require_limit)
+
+    registry.validate_flow({0: {"type": "limited", "limit": 3}})
+    with pytest.raises(NodeSchemaError):
+        registry.validate_flow({0: {"type": "limited"}})
+
+
+def test_validate_flow_accepts_json_string_keys():
+    """
+    A flow loaded from JSON has string node IDs; int 'next' targets must
+    still resolve against them, and a missing target must still dangle.
+    """
+    registry = StateRegistry()
+    flow = json.loads(
+        """
+        {
+            "0": {
+                "type": "choice",
+                "node_text": "Ready?",
+                "choices": {"go": "Let's go!"},
+                "next_for_choice": {"go": 1}
+            },
+            "1": {"type": "text", "node_text": "Tell me", "next": 99},
+            "99": {"type": "cutscene", "node_text": "Thanks!"}
+        }
+        """
+    )
+    registry.validate_flow(flow)
+
+    flow["1"]["next"] = 2
+    with pytest.raises(DanglingReferenceError):
+        registry.validate_flow(flow)
@@ -1,6 +1,6 @@
 import asyncio
 import pytest
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock
 
 from blue_flow_bot.core.state_flow import StateFlow
 from blue_flow_bot.core.registry import StateRegistry
@@ -12,7 +12,7 @@ async def test_constructor_triggers_validate_flow(
 ):
     # Arrange: spy on validate_flow
     registry = registry_factory()
-    registry.validate_flow = AsyncMock()
+    registry.validate_flow = MagicMock()
 
     # Act: construct StateFlow
     sf = StateFlow(
@@ -22,8 +22,8 @@ async def test_constructor_triggers_validate_flow(
         storage=local_storage,
     )
 
-    # Assert: validate_flow was awaited exactly once
-    registry.validate_flow.assert_awaited_once_with(
+    # Assert: validate_flow was called exactly once
+    registry.validate_flow.assert_called_once_with(
         {"0": {"type": "cutscene", "node_text": "Bye"}}
     )
 
@@ -102,8 +102,8 @@ async def test_process_update_propagates_cancelled_error(
         async def handle_message_of_state(self, *args, **kwargs):
             return None
 
-    registry.register_alias = AsyncMock(return_value=None)
-    await registry.register_alias("cancel", CancelState)
+    registry.register_alias = MagicMock(return_value=None)
+    registry.register_alias("cancel", CancelState)
     flow = {"0": {"type": "cancel", "node_text": ""}}
     sf = StateFlow(flow, registry, sqlite_db, local_storage)
 